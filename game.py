@@ -10,11 +10,97 @@ https://app/flintk12.com/activities/pygame-debug-le-1fe068/sessions/0fcb07bf-b3e
 '''
 
 import pygame
+import bisect
+import itertools
 import math
+import operator
 import random
 
+# Trajectory simulation for the aim preview
+# Kept outside the game class so the loop only touches plain numbers (no self lookups)
+# query_near (optional) gives the indices of the obstacles near a point, so far away ones are skipped
+# min_x/max_x/min_y/max_y are how far the ball's center can go before hitting a border
+# The path gets written into xs/ys (lists with room for n_steps + 1 points), returns how many points there are
+# boxes are the obstacles as (left, top, right, bottom) edges, see Level.obstacle_boxes
+def simulate_trajectory(x, y, vel_x, vel_y, boxes, min_x, max_x, min_y, max_y, radius, friction, n_steps, xs, ys, query_near=None):
+    xs[0] = x
+    ys[0] = y
+    count = 1
+    
+    # Grow every box by the radius once, so each step only checks the ball's center against it
+    # (and the pushed-out position is just the grown box's edge)
+    grown = [(ox - radius, oy - radius, right + radius, bottom + radius) for ox, oy, right, bottom in boxes]
+    nearby = grown
+    last_near = None  # query_near hands back the same object while the ball stays in the same cells
+    
+    for _ in range(n_steps):
+        # Move simulated ball
+        x += vel_x
+        y += vel_y
+        # Apply friction
+        vel_x *= friction
+        vel_y *= friction
+        
+        # Border collisions: bounce with 80% energy (only one side per axis can be hit)
+        if x < min_x:
+            x = min_x
+            vel_x *= -0.8
+        elif x > max_x:
+            x = max_x
+            vel_x *= -0.8
+        if y < min_y:
+            y = min_y
+            vel_y *= -0.8
+        elif y > max_y:
+            y = max_y
+            vel_y *= -0.8
+        
+        # Obstacle collisions similar to real physics
+        if query_near is not None:
+            near = query_near(x, y, radius)
+            if near is not last_near:
+                nearby = [grown[i] for i in near]
+                last_near = near
+        for left, top, right, bottom in nearby:
+            if left < x < right and top < y < bottom:
+                penetration_left = x - left  # All positive inside the box, so no abs() needed
+                penetration_right = right - x
+                penetration_top = y - top
+                penetration_bottom = bottom - y
+                # Index of the smallest penetration (0 left, 1 right, 2 top, 3 bottom)
+                side = 0
+                min_pen = penetration_left
+                if penetration_right < min_pen:
+                    side = 1
+                    min_pen = penetration_right
+                if penetration_top < min_pen:
+                    side = 2
+                    min_pen = penetration_top
+                if penetration_bottom < min_pen:
+                    side = 3
+                # Left/right hits flip X, top/bottom hits flip Y
+                if side < 2:
+                    x = left if side == 0 else right
+                    vel_x *= -0.8
+                else:
+                    y = top if side == 2 else bottom
+                    vel_y *= -0.8
+        
+        xs[count] = x
+        ys[count] = y
+        count += 1
+        
+        # Stop simulation if speed very low (same box test as Ball.update, written without abs() calls)
+        if -0.1 < vel_x < 0.1 and -0.1 < vel_y < 0.1:
+            break
+    
+    return count
+
 # Base class for game objects
 class GameObject:
+    # Fixed attribute slots (no per-object __dict__), subclasses add their own below
+    __slots__ = ("x", "y")
+    
     def __init__(self, x, y):
         self.x = x  # Horizontal position
         self.y = y  # Vertical position
@@ -27,29 +113,39 @@ class GameObject:
 
 # This is for stuff that gets in your way
 class Obstacle(GameObject):
+    __slots__ = ("width", "height", "color", "rect")
+    
     def __init__(self, x, y, width, height, color):
         super().__init__(x, y)  # Initialize parent class attributes
         self.width = width      # Width of the obstacle
         self.height = height    # Height of the obstacle
         self.color = color      # Color (RGB tuple)
+        self.rect = pygame.Rect(int(x), int(y), width, height)  # Where it's drawn, moved along with x/y
     
     def draw(self, screen):
-        pygame.draw.rect(
-            screen, self.color,
-            (int(self.x), int(self.y), self.width, self.height)  # Draw rectangle at position
-        )
+        self.rect.topleft = (int(self.x), int(self.y))  # Draw rectangle at position
+        pygame.draw.rect(screen, self.color, self.rect)
     
     def get_collision_rect(self):
         # This is used to check if we hit something
         return (self.x, self.y, self.width, self.height)
+    
+    def get_hit_rect(self):
+        # Whole-pixel pygame.Rect that fully covers the collision rect (for quick checks)
+        return pygame.Rect(int(self.x) - 1, int(self.y) - 1, int(self.width) + 3, int(self.height) + 3)
 
 # Static wall obstacle
 class Wall(Obstacle):
+    __slots__ = ()
+    
     def __init__(self, x, y, width, height):  # Traits of the wall
         super().__init__(x, y, width, height, (0, 0, 139))  # Dark blue walls
 
 # Moving platform obstacle
 class MovingPlatform(Obstacle):
+    # Only the fields for its own move type get set (base_x/base_y, amp, speed, dir or dx/dy)
+    __slots__ = ("move_type", "image", "base_x", "base_y", "amp", "speed", "dir", "dx", "dy")
+    
     def __init__(self, x, y, w=None, h=None, width=None, height=None, move_type=None, **kwargs):
         # Handle both w/h and width/height naming conventions
         actual_width = width if width is not None else w
@@ -58,77 +154,63 @@ class MovingPlatform(Obstacle):
         super().__init__(x, y, actual_width, actual_height, (148, 0, 211))  # Purple platforms
         self.move_type = move_type
         
+        # Pre-filled image so all the platforms can be drawn with one blits call
+        self.image = pygame.Surface((actual_width, actual_height)).convert()
+        self.image.fill(self.color)
+        
+        # Keep the physics numbers as floats so collision math never mixes ints and floats
+        self.x = float(self.x)
+        self.y = float(self.y)
+        self.width = float(self.width)
+        self.height = float(self.height)
+        
         if move_type == "vertical":
-            self.base_y = kwargs.get("base_y", y)  # Starting Y position
+            self.base_y = float(kwargs.get("base_y", y))  # Starting Y position
             self.amp = kwargs.get("amp", 50)        # How far up/down it moves
             self.speed = kwargs.get("speed", 1.0)   # Movement speed
             self.dir = kwargs.get("dir", 1)         # Direction: 1 down, -1 up
         elif move_type == "horizontal":
-            self.base_x = kwargs.get("base_x", x)  # Starting X position
+            self.base_x = float(kwargs.get("base_x", x))  # Starting X position
             self.amp = kwargs.get("amp", 50)       # How far left/right it moves
             self.speed = kwargs.get("speed", 1.0)  # Movement speed
             self.dir = kwargs.get("dir", 1)        # Direction: 1 right, -1 left
         elif move_type == "random":
             self.dx = kwargs.get("dx", random.uniform(-2, 2))  # Random X speed
             self.dy = kwargs.get("dy", random.uniform(-2, 2))  # Random Y speed
-    
-    def update(self, dt, border_thickness, window_width, window_height):
-        # Move the platform based on type and bounce off borders
-        if self.move_type == "vertical":
-            # Y movement = speed * direction
-            self.y += self.speed * self.dir  # Move up/down
-            # If moved beyond amplitude, reverse direction
-            if abs(self.y - self.base_y) >= self.amp:
-                self.dir *= -1                 # Flip direction
-                self.y += self.speed * self.dir
-        elif self.move_type == "horizontal":
-            # X movement = speed * direction
-            self.x += self.speed * self.dir  # Move left/right
-            # If moved beyond amplitude, reverse direction
-            if abs(self.x - self.base_x) >= self.amp:
-                self.dir *= -1                 # Flip direction
-                self.x += self.speed * self.dir
-        elif self.move_type == "random":
-            # Random drift
-            self.x += self.dx  # Move by dx
-            self.y += self.dy  # Move by dy
-            # Bounce off vertical borders
-            if self.x < border_thickness or self.x + self.width > window_width - border_thickness:
-                self.dx *= -1   # Reverse X direction
-            # Bounce off horizontal borders
-            if self.y < border_thickness or self.y + self.height > window_height - border_thickness:
-                self.dy *= -1   # Reverse Y direction
 
 # Repulsor obstacle
 class Repulsor(GameObject):
     # A circular obstacle that bounces around and repels the ball on contact
+    __slots__ = ("radius", "color", "dx", "dy", "image", "rect")
+    
     def __init__(self, x, y, radius=None, color=None, dx=0, dy=0, **kwargs):
         super().__init__(x, y)
         self.radius = radius  # Circle radius
         self.color = color    # Circle color
         self.dx = dx          # X velocity
         self.dy = dy          # Y velocity
+        
+        # Circle drawn once onto its own image, then just blitted (1px spare around the edge)
+        self.image = pygame.Surface((radius * 2 + 2, radius * 2 + 2), pygame.SRCALPHA).convert_alpha()
+        self.image.fill((0, 0, 0, 0))
+        pygame.draw.circle(self.image, color, (radius + 1, radius + 1), radius)
+        self.rect = self.image.get_rect()
+        self.move_rect()
     
-    def update(self, dt, border_thickness, window_width, window_height):
-        # Move the repulsor and bounce off borders
-        self.x += self.dx  # Move by dx
-        self.y += self.dy  # Move by dy
-        # Bounce on left/right
-        if self.x - self.radius < border_thickness or self.x + self.radius > window_width - border_thickness:
-            self.dx *= -1   # Reverse X direction
-        # Bounce on top/bottom
-        if self.y - self.radius < border_thickness or self.y + self.radius > window_height - border_thickness:
-            self.dy *= -1   # Reverse Y direction
-    
-    def draw(self, screen):
-        pygame.draw.circle(
-            screen, self.color,
-            (int(self.x), int(self.y)),
-            self.radius
-        )
+    def move_rect(self):
+        # Line the image up with the circle's center
+        self.rect.topleft = (int(self.x) - self.radius - 1, int(self.y) - self.radius - 1)
 
 # Ball class
 class Ball(GameObject):
+    # What handle_obstacle_collision returns for each side index
+    SIDE_NAMES = ("left", "right", "top", "bottom")
+    
+    __slots__ = (
+        "radius", "image", "velocity_x", "velocity_y",
+        "is_moving", "teleporting", "friction", "repulsor_bounce", "hit_rect"
+    )
+    
     # Ball: player-controlled golf ball with physics
     def __init__(self, x, y, radius, image):
         super().__init__(x, y)
@@ -139,14 +221,21 @@ class Ball(GameObject):
         self.is_moving = False     # Flag for movement
         self.teleporting = False   # Flag for end-of-level movement
         self.friction = 0.98       # Air friction factor
+        self.repulsor_bounce = self.bounce_reverse  # Changed by set_level
+        self.hit_rect = pygame.Rect(0, 0, radius * 2 + 2, radius * 2 + 2)  # Padded box for first_hit_index
     
-    def launch(self, angle_degrees, power, max_power):
+    def launch(self, angle_degrees, power, max_power, cos_sin=None):
         self.is_moving = True
         # Scale power to a speed up to 15
         speed = (power / max_power) * 15  # Calculate speed ratio
+        # cos/sin of the angle can be passed in if they're already known
+        if cos_sin is None:
+            angle = math.radians(angle_degrees)
+            cos_sin = (math.cos(angle), math.sin(angle))
+        cos_a, sin_a = cos_sin
         # Break speed into X and Y using angle
-        self.velocity_x = speed * math.cos(math.radians(angle_degrees))  # Horizontal component
-        self.velocity_y = -speed * math.sin(math.radians(angle_degrees)) # Vertical component (negative for upward)
+        self.velocity_x = speed * cos_a   # Horizontal component
+        self.velocity_y = -speed * sin_a  # Vertical component (negative for upward)
     
     def stop(self):
         self.is_moving = False
@@ -155,81 +244,100 @@ class Ball(GameObject):
     
     def update(self, dt):
         if self.is_moving and not self.teleporting:
-            # Apply air friction to slow down
-            self.velocity_x *= self.friction  # Reduce X speed
-            self.velocity_y *= self.friction  # Reduce Y speed
+            # Apply air friction to slow down (worked on in locals, written back once)
+            vel_x = self.velocity_x * self.friction  # Reduce X speed
+            vel_y = self.velocity_y * self.friction  # Reduce Y speed
             
             # Update position by velocity
-            self.x += self.velocity_x  # Move horizontally
-            self.y += self.velocity_y  # Move vertically
+            self.x += vel_x  # Move horizontally
+            self.y += vel_y  # Move vertically
             
             # If very slow, stop completely
-            if abs(self.velocity_x) < 0.1 and abs(self.velocity_y) < 0.1:
+            if -0.1 < vel_x < 0.1 and -0.1 < vel_y < 0.1:
                 self.stop()
+            else:
+                self.velocity_x = vel_x
+                self.velocity_y = vel_y
     
-    def draw(self, screen):
-        screen.blit(
-            self.image,
-            (int(self.x - self.radius), int(self.y - self.radius))
-        )
+    def blit_item(self):
+        # (image, top-left) for drawing the ball, so it can go into a screen.blits batch
+        return (self.image, (int(self.x - self.radius), int(self.y - self.radius)))
     
-    def handle_border_collision(self, border_thickness, window_width, window_height):
+    def handle_border_collision(self, min_x, max_x, min_y, max_y):
+        # The limits are where the ball's center touches each border
+        # (the ball can only be past one side per axis, so the right/bottom checks are elifs)
+        x = self.x
+        y = self.y
         # Bounce off left border
-        if self.x - self.radius < border_thickness:
-            self.x = border_thickness + self.radius  # Reset position
+        if x < min_x:
+            self.x = min_x  # Reset position
             self.velocity_x *= -0.8  # Reverse and reduce speed
         # Bounce off right border
-        if self.x + self.radius > window_width - border_thickness:
-            self.x = window_width - border_thickness - self.radius
+        elif x > max_x:
+            self.x = max_x
             self.velocity_x *= -0.8
         # Bounce off top border
-        if self.y - self.radius < border_thickness:
-            self.y = border_thickness + self.radius
+        if y < min_y:
+            self.y = min_y
             self.velocity_y *= -0.8
         # Bounce off bottom border
-        if self.y + self.radius > window_height - border_thickness:
-            self.y = window_height - border_thickness - self.radius
+        elif y > max_y:
+            self.y = max_y
             self.velocity_y *= -0.8
     
+    def first_hit_index(self, hit_rects, start=0):
+        # Find the first pygame.Rect (from start on) that might overlap the ball, -1 if none
+        # pygame does the checks in C; the rects are a pixel bigger than the real ones so
+        # nothing gets missed, and the exact check happens in the collision handlers
+        # (the ball's own padded rect is kept and just moved, instead of making a new one each call)
+        ball_rect = self.hit_rect
+        ball_rect.topleft = (int(self.x - self.radius) - 1, int(self.y - self.radius) - 1)
+        hit = ball_rect.collidelist(hit_rects[start:] if start else hit_rects)
+        if hit == -1:
+            return -1
+        return hit + start
+    
     def handle_obstacle_collision(self, obstacle):
         ox, oy, ow, oh = obstacle
+        right = ox + ow
+        bottom = oy + oh
+        r = self.radius
+        # Ball's own edges
+        ball_left = self.x - r
+        ball_right = self.x + r
+        ball_top = self.y - r
+        ball_bottom = self.y + r
         # Check overlapping box vs circle bounds
-        if (self.x + self.radius > ox and
-            self.x - self.radius < ox + ow and
-            self.y + self.radius > oy and
-            self.y - self.radius < oy + oh):
+        if ball_right > ox and ball_left < right and ball_bottom > oy and ball_top < bottom:
             
             # Compute penetration depths on each side
-            penetration_left = abs(self.x + self.radius - ox)
-            penetration_right = abs(self.x - self.radius - (ox + ow))
-            penetration_top = abs(self.y + self.radius - oy)
-            penetration_bottom = abs(self.y - self.radius - (oy + oh))
+            # (all of them are positive while overlapping, so no abs() needed)
+            penetration_left = ball_right - ox
+            penetration_right = right - ball_left
+            penetration_top = ball_bottom - oy
+            penetration_bottom = bottom - ball_top
             
             # Find smallest overlap to know collision side
-            min_pen = min(
-                penetration_left,
-                penetration_right,
-                penetration_top,
-                penetration_bottom
-            )
+            # (0 left, 1 right, 2 top, 3 bottom, ties go to the earlier side)
+            side = 0
+            min_pen = penetration_left
+            if penetration_right < min_pen:
+                side = 1
+                min_pen = penetration_right
+            if penetration_top < min_pen:
+                side = 2
+                min_pen = penetration_top
+            if penetration_bottom < min_pen:
+                side = 3
             
-            # Respond based on side hit
-            if min_pen == penetration_left:
-                self.x = ox - self.radius
-                self.velocity_x *= -0.8
-                return "left"
-            elif min_pen == penetration_right:
-                self.x = ox + ow + self.radius
+            # Respond based on side hit (left/right flip X, top/bottom flip Y)
+            if side < 2:
+                self.x = ox - r if side == 0 else right + r
                 self.velocity_x *= -0.8
-                return "right"
-            elif min_pen == penetration_top:
-                self.y = oy - self.radius
-                self.velocity_y *= -0.8
-                return "top"
             else:
-                self.y = oy + oh + self.radius
+                self.y = oy - r if side == 2 else bottom + r
                 self.velocity_y *= -0.8
-                return "bottom"
+            return self.SIDE_NAMES[side]
         return None
     
     def handle_platform_collision(self, platform):
@@ -244,16 +352,18 @@ class Ball(GameObject):
             elif collision_side in ["top", "bottom"] and platform.move_type == "vertical":
                 self.velocity_y += platform.speed * platform.dir * 0.5  # Boost Y
     
-    def handle_repulsor_collision(self, repulsor, current_level):
+    def handle_repulsor_collision(self, repulsor):
         # Vector from repulsor to ball
         dx = self.x - repulsor.x
         dy = self.y - repulsor.y
-        dist = math.hypot(dx, dy)  # Distance between centers
+        touch_dist = self.radius + repulsor.radius
+        dist_sq = dx * dx + dy * dy  # Squared distance, no sqrt needed just to check for contact
         
-        if dist < self.radius + repulsor.radius:
+        if dist_sq < touch_dist * touch_dist:
+            dist = math.sqrt(dist_sq)  # Distance between centers
             # Calculate overlap amount
             if dist > 0:
-                overlap = (self.radius + repulsor.radius) - dist
+                overlap = touch_dist - dist
                 push_amount = overlap + 0.1  # Add a small extra
                 norm_dx = dx / dist        # Unit X
                 norm_dy = dy / dist        # Unit Y
@@ -261,38 +371,50 @@ class Ball(GameObject):
                 self.y += norm_dy * push_amount
             else:
                 # Exactly same spot, push right
-                push_amount = (self.radius + repulsor.radius) + 0.1
+                push_amount = touch_dist + 0.1
                 self.x += push_amount
                 norm_dx, norm_dy = 1.0, 0.0
             
-            # Bounce logic depends on level
-            if current_level == 4:
-                incoming = math.hypot(self.velocity_x, self.velocity_y)  # Speed magnitude
-                ref_speed = max(incoming, 1.0)  # At least 1
-                launch = 4 * ref_speed           # Boost factor
-                self.velocity_x = norm_dx * launch
-                self.velocity_y = norm_dy * launch
-            elif current_level == 5:
-                incoming = math.hypot(self.velocity_x, self.velocity_y)
-                if incoming > 0:
-                    vx_norm = self.velocity_x / incoming
-                    vy_norm = self.velocity_y / incoming
-                    self.velocity_x = -4 * incoming * vx_norm  # Reverse and boost
-                    self.velocity_y = -4 * incoming * vy_norm
-            else:
-                self.velocity_x *= -1.1  # Reverse and slightly boost
-                self.velocity_y *= -1.1
+            # Bounce logic depends on level (picked in set_level)
+            self.repulsor_bounce(norm_dx, norm_dy)
             
             return True
         return False
     
+    def set_level(self, level_number):
+        # Choose how repulsors bounce the ball on this level
+        if level_number == 4:
+            self.repulsor_bounce = self.bounce_launch
+        elif level_number == 5:
+            self.repulsor_bounce = self.bounce_reverse_boost
+        else:
+            self.repulsor_bounce = self.bounce_reverse
+    
+    def bounce_launch(self, norm_dx, norm_dy):
+        # Level 4: fire the ball straight away from the repulsor
+        incoming = math.hypot(self.velocity_x, self.velocity_y)  # Speed magnitude
+        ref_speed = max(incoming, 1.0)  # At least 1
+        launch = 4 * ref_speed           # Boost factor
+        self.velocity_x = norm_dx * launch
+        self.velocity_y = norm_dy * launch
+    
+    def bounce_reverse_boost(self, norm_dx, norm_dy):
+        # Level 5: send the ball back the way it came, 4 times faster
+        # (speed times unit direction is just the velocity, so no hypot needed)
+        self.velocity_x *= -4  # Reverse and boost
+        self.velocity_y *= -4
+    
+    def bounce_reverse(self, norm_dx, norm_dy):
+        # Other levels
+        self.velocity_x *= -1.1  # Reverse and slightly boost
+        self.velocity_y *= -1.1
+    
     def teleport_to_hole(self, hole_x, hole_y, hole_sound):
         # Move ball toward hole when close
         dx = hole_x - self.x
         dy = hole_y - self.y
-        distance = math.hypot(dx, dy)  # Distance to hole
         
-        if distance < 2:
+        if dx * dx + dy * dy < 4:  # Closer than 2 pixels (squared, so no sqrt)
             # Snap into hole
             self.x = hole_x
             self.y = hole_y
@@ -302,10 +424,10 @@ class Ball(GameObject):
             hole_sound.play()
             return True
         
-        # Move partway each frame
-        move_factor = min(0.2, distance / 10)  # At most 20% of distance
-        self.x += dx * move_factor
-        self.y += dy * move_factor
+        # Move 20% of the way each frame
+        # (was min(0.2, distance / 10), but distance is at least 2 here so that's always 0.2)
+        self.x += dx * 0.2
+        self.y += dy * 0.2
         self.velocity_x *= 0.8  # Slow down while teleporting
         self.velocity_y *= 0.8
         
@@ -330,12 +452,16 @@ class Button(UIElement):
         self.color = color
         self.text_color = text_color
         self.font = font
+        self.text_surface = None  # Rendered label, redone only when text or text_color change
+        self.rendered_as = None
     
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
-        text_surface = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        if self.rendered_as != (self.text, self.text_color):
+            self.text_surface = self.font.render(self.text, True, self.text_color).convert_alpha()
+            self.text_rect = self.text_surface.get_rect(center=self.rect.center)
+            self.rendered_as = (self.text, self.text_color)
+        screen.blit(self.text_surface, self.text_rect)
 
 # Slider class
 class Slider(UIElement):
@@ -343,15 +469,36 @@ class Slider(UIElement):
         super().__init__(x, y, width, height)
         self.min_value = min_value
         self.max_value = max_value
+        self.knob_y = int(self.y + self.height // 2)  # Knob only ever moves sideways
         self.value = initial_value
         self.color = color
         self.dragging = False
+        self.cached_angle = None        # Value the cos/sin below were worked out for
+        self.cached_cos_sin = (1.0, 0.0)
+    
+    @property
+    def value(self):
+        return self._value
+    
+    @value.setter
+    def value(self, new_value):
+        self._value = new_value
+        # Knob position only changes with the value, so work it out here instead of every draw
+        self.knob_x = int(self.x + (new_value / self.max_value) * self.width)  # Position along track
+        self.knob_pos = (self.knob_x, self.knob_y)
+    
+    @property
+    def cos_sin(self):
+        # (cos, sin) of the value in degrees, only recalculated when the value changes
+        if self.value != self.cached_angle:
+            angle = math.radians(self.value)
+            self.cached_cos_sin = (math.cos(angle), math.sin(angle))
+            self.cached_angle = self.value
+        return self.cached_cos_sin
     
     def draw(self, screen):
         pygame.draw.rect(screen, (255, 255, 255), self.rect)
-        # Calculate slider knob position from value ratio
-        slider_x = self.x + (self.value / self.max_value) * self.width  # Position along track
-        pygame.draw.circle(screen, (0, 0, 0), (int(slider_x), int(self.y + self.height // 2)), 9)
+        pygame.draw.circle(screen, (0, 0, 0), self.knob_pos, 9)
     
     def handle_mouse_down(self, mouse_pos):
         if self.rect.collidepoint(mouse_pos):
@@ -372,12 +519,26 @@ class Slider(UIElement):
 
 # Level class
 class Level:
+    # Levels with at least this many moving things use the spatial grid for collision checks
+    GRID_MIN_OBJECTS = 10
+    
     def __init__(self, level_number, hole_position, walls_data, window_width, window_height, border_thickness):
         self.level_number = level_number
         self.hole_x, self.hole_y = hole_position
+        self.hole_image = pygame.Surface((26, 26), pygame.SRCALPHA).convert_alpha()  # Radius 12 plus 1px spare
+        self.hole_image.fill((0, 0, 0, 0))
+        pygame.draw.circle(self.hole_image, (0, 0, 0), (13, 13), 12)
+        self.hole_pos = (int(self.hole_x) - 13, int(self.hole_y) - 13)
+        self.draw_list = []  # Filled in by build_draw_list
         self.walls = []
         self.moving_platforms = []
+        # Platforms split by how they move, so each kind is moved together in one loop
+        self.random_platforms = []
+        self.vertical_platforms = []
+        self.horizontal_platforms = []
+        self.is_animated = False  # Whether anything in the level moves (set when movers are added)
         self.repulsors = []
+        self.moving_repulsors = []  # The ones with a speed, level 4's just sit still
         self.window_width = window_width
         self.window_height = window_height
         self.border_thickness = border_thickness
@@ -386,47 +547,250 @@ class Level:
         for wall_data in walls_data:
             x, y, w, h = wall_data
             self.walls.append(Wall(x, y, w, h))
+        
+        # Collision rects: walls never move so theirs are built once,
+        # platform rects get refreshed whenever the platforms move
+        self.wall_rects = [
+            tuple(float(value) for value in wall.get_collision_rect())  # Floats like the ball's position
+            for wall in self.walls
+        ]
+        self.wall_hit_rects = [wall.get_hit_rect() for wall in self.walls]
+        self.platform_hit_rects = []
+        self.platform_blits = []  # (image, rect) for every platform, the rects get moved by update_platform_rects
+        self.repulsor_blits = []  # Same for the repulsors, moved by move_repulsors
+        self.obstacle_rects = list(self.wall_rects)  # Walls first, then one slot per platform
+        # Same obstacles as (left, top, right, bottom) edges, which is what the aim preview needs
+        self.obstacle_boxes = [(x, y, x + w, y + h) for x, y, w, h in self.wall_rects]
+        self.obstacles_version = 0  # Goes up every time the obstacle rects change
+        
+        # Course background with this level's walls drawn on, made by bake_background
+        self.background = None
+        
+        # Spatial grid: (cell x, cell y) -> indices of the things touching that cell
+        self.use_grid = False
+        self.grid_cell_size = 1
+        self.obstacle_grid = {}   # Indices into obstacle_rects
+        self.repulsor_grid = {}   # Indices into repulsors
+        # Query results by cell range, emptied whenever the grid is rebuilt
+        self.obstacle_queries = {}
+        self.repulsor_queries = {}
     
     def add_moving_platforms(self, platforms_data):
         for platform_data in platforms_data:
-            self.moving_platforms.append(MovingPlatform(**platform_data))
+            platform = MovingPlatform(**platform_data)
+            self.moving_platforms.append(platform)
+            self.platform_hit_rects.append(platform.get_hit_rect())
+            self.platform_blits.append((platform.image, platform.rect))
+            self.obstacle_rects.append(platform.get_collision_rect())
+            self.obstacle_boxes.append(None)  # Filled in by update_platform_rects
+            if platform.move_type == "random":
+                self.random_platforms.append(platform)
+            elif platform.move_type == "vertical":
+                self.vertical_platforms.append(platform)
+            elif platform.move_type == "horizontal":
+                self.horizontal_platforms.append(platform)
+        self.update_platform_rects()
+        self.setup_grid()
+        self.build_draw_list()
+        self.is_animated = bool(self.moving_platforms or self.moving_repulsors)
+    
+    def update_platform_rects(self):
+        # Refresh the cached rects after the platforms have moved
+        # The platform slots come after the walls and get overwritten in place (no new list each frame)
+        self.obstacles_version += 1  # Tells the aim preview its cached path might be out of date
+        rects = self.obstacle_rects
+        boxes = self.obstacle_boxes
+        for i, platform, hit_rect in zip(
+                itertools.count(len(self.wall_rects)), self.moving_platforms, self.platform_hit_rects):
+            x = platform.x
+            y = platform.y
+            width = platform.width
+            height = platform.height
+            rects[i] = (x, y, width, height)
+            boxes[i] = (x, y, x + width, y + height)
+            # Sizes don't change, so just move the quick-check and drawing rects
+            ix = int(x)
+            iy = int(y)
+            hit_rect.topleft = (ix - 1, iy - 1)
+            platform.rect.topleft = (ix, iy)
     
     def add_repulsors(self, repulsors_data):
         for repulsor_data in repulsors_data:
-            self.repulsors.append(Repulsor(**repulsor_data))
+            repulsor = Repulsor(**repulsor_data)
+            self.repulsors.append(repulsor)
+            if repulsor.dx or repulsor.dy:
+                self.moving_repulsors.append(repulsor)
+            self.repulsor_blits.append((repulsor.image, repulsor.rect))
+        self.setup_grid()
+        self.build_draw_list()
+        self.is_animated = bool(self.moving_platforms or self.moving_repulsors)
     
-    def update(self, dt):
-        for platform in self.moving_platforms:
-            platform.update(dt, self.border_thickness, self.window_width, self.window_height)
+    def setup_grid(self):
+        # Only worth it when there are lots of moving things (level 5)
+        self.use_grid = len(self.moving_platforms) + len(self.moving_repulsors) >= self.GRID_MIN_OBJECTS
+        if not self.use_grid:
+            return
         
+        # Cells are about twice the size of the biggest moving thing
+        biggest = 0
+        for platform in self.moving_platforms:
+            biggest = max(biggest, platform.width, platform.height)
         for repulsor in self.repulsors:
-            repulsor.update(dt, self.border_thickness, self.window_width, self.window_height)
+            biggest = max(biggest, repulsor.radius * 2)
+        self.grid_cell_size = max(1, 2 * biggest)
+        self.rebuild_grid()
     
-    def draw(self, screen):
-        # Draw walls
+    def rebuild_grid(self):
+        # Put every obstacle and repulsor into the cells its box touches
+        self.obstacle_queries = {}
+        self.repulsor_queries = {}
+        self.obstacle_grid = {}
+        for i, (x, y, w, h) in enumerate(self.obstacle_rects):
+            self.add_to_grid(self.obstacle_grid, i, x, y, x + w, y + h)
+        
+        self.repulsor_grid = {}
+        for i, repulsor in enumerate(self.repulsors):
+            self.add_to_grid(
+                self.repulsor_grid, i,
+                repulsor.x - repulsor.radius, repulsor.y - repulsor.radius,
+                repulsor.x + repulsor.radius, repulsor.y + repulsor.radius
+            )
+    
+    def add_to_grid(self, grid, index, left, top, right, bottom):
+        cell = self.grid_cell_size
+        for cx in range(int(left // cell), int(right // cell) + 1):
+            for cy in range(int(top // cell), int(bottom // cell) + 1):
+                grid.setdefault((cx, cy), []).append(index)
+    
+    def query_grid(self, grid, queries, x, y, r):
+        # Indices of everything in the cells around the circle, in list order
+        # The ball stays in the same cells for many steps of the aim preview,
+        # so the answer for each cell range is kept in queries and handed back as is
+        cell = self.grid_cell_size
+        min_cx = int((x - r) // cell)
+        max_cx = int((x + r) // cell)
+        min_cy = int((y - r) // cell)
+        max_cy = int((y + r) // cell)
+        key = (min_cx, max_cx, min_cy, max_cy)
+        result = queries.get(key)
+        if result is not None:
+            return result
+        
+        found = set()
+        get_cell = grid.get
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                found.update(get_cell((cx, cy), ()))
+        result = queries[key] = tuple(sorted(found))
+        return result
+    
+    def query_near(self, x, y, r):
+        # Obstacle rects that could touch a circle at (x, y)
+        if not self.use_grid:
+            return range(len(self.obstacle_rects))
+        return self.query_grid(self.obstacle_grid, self.obstacle_queries, x, y, r)
+    
+    def query_near_repulsors(self, x, y, r):
+        # Repulsors that could touch a circle at (x, y)
+        if not self.use_grid:
+            return range(len(self.repulsors))
+        return self.query_grid(self.repulsor_grid, self.repulsor_queries, x, y, r)
+    
+    def update(self, dt):
+        if self.vertical_platforms or self.horizontal_platforms:
+            self.move_path_platforms()
+        if self.random_platforms:
+            self.move_random_platforms()
+        if self.moving_platforms:
+            self.update_platform_rects()
+        
+        if self.moving_repulsors:
+            self.move_repulsors()
+        
+        if self.use_grid:
+            self.rebuild_grid()
+    
+    def move_path_platforms(self):
+        # Move the vertical and horizontal platforms back and forth, one loop per kind
+        for platform in self.vertical_platforms:
+            step = platform.speed * platform.dir
+            y = platform.y + step
+            # If moved beyond amplitude, reverse direction
+            if abs(y - platform.base_y) >= platform.amp:
+                platform.dir = -platform.dir
+                y -= step
+            platform.y = y
+        
+        for platform in self.horizontal_platforms:
+            step = platform.speed * platform.dir
+            x = platform.x + step
+            if abs(x - platform.base_x) >= platform.amp:
+                platform.dir = -platform.dir
+                x -= step
+            platform.x = x
+    
+    def move_random_platforms(self):
+        # Random drift, bouncing off the borders, done in one loop for all of them
+        left = self.border_thickness
+        top = self.border_thickness
+        right = self.window_width - self.border_thickness
+        bottom = self.window_height - self.border_thickness
+        for platform in self.random_platforms:
+            x = platform.x + platform.dx
+            y = platform.y + platform.dy
+            platform.x = x
+            platform.y = y
+            if x < left or x + platform.width > right:
+                platform.dx *= -1
+            if y < top or y + platform.height > bottom:
+                platform.dy *= -1
+    
+    def move_repulsors(self):
+        # Drift and bounce off the borders, done in one loop for all the moving ones
+        left = self.border_thickness
+        top = self.border_thickness
+        right = self.window_width - self.border_thickness
+        bottom = self.window_height - self.border_thickness
+        for repulsor in self.moving_repulsors:
+            x = repulsor.x + repulsor.dx
+            y = repulsor.y + repulsor.dy
+            repulsor.x = x
+            repulsor.y = y
+            r = repulsor.radius
+            if x - r < left or x + r > right:
+                repulsor.dx *= -1
+            if y - r < top or y + r > bottom:
+                repulsor.dy *= -1
+            repulsor.move_rect()
+    
+    def bake_background(self, course_background):
+        # Walls never move, so draw them once onto a copy of the course background
+        self.background = course_background.copy()
         for wall in self.walls:
-            wall.draw(screen)
-        
-        # Draw moving platforms
-        for platform in self.moving_platforms:
-            platform.draw(screen)
-        
-        # Draw repulsors
-        for repulsor in self.repulsors:
-            repulsor.draw(screen)
-        
-        # Draw hole
-        pygame.draw.circle(screen, (0, 0, 0), (int(self.hole_x), int(self.hole_y)), 12)
+            wall.draw(self.background)
+        self.build_draw_list()
+    
+    def build_draw_list(self):
+        # Everything the level draws, in order, as one list for screen.blits
+        # The platform and repulsor rects in it get moved in place, so it's only rebuilt when things are added
+        self.draw_list = []
+        if self.background is not None:
+            self.draw_list.append((self.background, (0, 0)))  # Course, borders and walls
+        self.draw_list.extend(self.platform_blits)
+        self.draw_list.extend(self.repulsor_blits)
+        self.draw_list.append((self.hole_image, self.hole_pos))  # Hole goes over the platforms
+    
+    def draw(self, screen):
+        # Background, platforms, repulsors and hole all in one call
+        screen.blits(self.draw_list, False)
     
     def get_all_obstacles(self):
-        obstacles = []
-        for wall in self.walls:
-            obstacles.append(wall.get_collision_rect())
-        
-        for platform in self.moving_platforms:
-            obstacles.append(platform.get_collision_rect())
-        
-        return obstacles
+        # Cached list, don't modify it
+        return self.obstacle_rects
+    
+    def get_obstacle_boxes(self):
+        # Cached list of (left, top, right, bottom), don't modify it
+        return self.obstacle_boxes
 
 # Game class
 class MiniGolfGame:
@@ -434,15 +798,35 @@ class MiniGolfGame:
         pygame.init()
         pygame.mixer.init()
         
+        # Only queue the events handle_events actually looks at (no key-ups, most window events, etc.)
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([
+            pygame.QUIT, pygame.KEYDOWN,
+            pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+            pygame.WINDOWEXPOSED
+        ])
+        
         # Constants
         self.WINDOW_WIDTH, self.WINDOW_HEIGHT = 800, 600
+        self.WINDOW_AREA = self.WINDOW_WIDTH * self.WINDOW_HEIGHT
         self.BORDER_THICKNESS = 30
         self.BALL_RADIUS = 10
         self.HOLE_RADIUS = 12
         self.HOLE_CAPTURE_FACTOR = 0.75
+        self.HOLE_CAPTURE_DIST_SQ = (self.HOLE_RADIUS * self.HOLE_CAPTURE_FACTOR) ** 2  # Squared capture distance
         self.MAX_POWER = 300
         self.AIR_FRICTION_FACTOR = 0.98
         self.TOTAL_LEVELS = 5
+        self.TRAJECTORY_STEPS = 200
+        self.PHYSICS_DT = 1 / 60        # Length of one physics step (movement is per step, so this sets the game speed)
+        self.MAX_PHYSICS_STEPS = 5      # Most steps to catch up in one frame, the rest of a long stall is dropped
+        self.PHYSICS_SLACK = 0.002      # clock.tick(60) gives 16 or 17 ms frames, this keeps those at one step each
+        
+        # Furthest the ball's center can go before touching a border
+        self.BALL_MIN_X = self.BORDER_THICKNESS + self.BALL_RADIUS
+        self.BALL_MAX_X = self.WINDOW_WIDTH - self.BORDER_THICKNESS - self.BALL_RADIUS
+        self.BALL_MIN_Y = self.BORDER_THICKNESS + self.BALL_RADIUS
+        self.BALL_MAX_Y = self.WINDOW_HEIGHT - self.BORDER_THICKNESS - self.BALL_RADIUS
         
         # Colors
         self.GREEN = (0, 150, 0)
@@ -463,6 +847,17 @@ class MiniGolfGame:
         self.big_font = pygame.font.Font(None, 48)
         self.clock = pygame.time.Clock()
         
+        # Dark overlay and messages for the pause/win/lose screens never change, so make them once
+        # (convert_alpha puts them in the window's pixel format so blitting them is a straight copy)
+        self.dim_overlay = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT), pygame.SRCALPHA).convert_alpha()
+        self.dim_overlay.fill(self.OVERLAY)
+        self.win_text = self.big_font.render("YOU WIN! CONGRATS!", True, self.YELLOW).convert_alpha()
+        self.win_text_rect = self.win_text.get_rect(center=(self.WINDOW_WIDTH//2, self.WINDOW_HEIGHT//2 - 50))
+        self.lose_text = self.big_font.render("TIME'S UP! YOU LOSE!", True, self.RED).convert_alpha()
+        self.lose_text_rect = self.lose_text.get_rect(center=(self.WINDOW_WIDTH//2, self.WINDOW_HEIGHT//2 - 50))
+        self.pause_text = self.big_font.render("PAUSED", True, self.WHITE).convert_alpha()
+        self.pause_text_pos = (self.WINDOW_WIDTH//2 - 80, self.WINDOW_HEIGHT//2 - 80)
+        
         # Load sounds
         self.hole_sound = pygame.mixer.Sound("sound.wav")
         
@@ -471,7 +866,22 @@ class MiniGolfGame:
         self.ball_image = pygame.transform.smoothscale(
             ball_img_orig,
             (self.BALL_RADIUS*2, self.BALL_RADIUS*2)  # Diameter = 2 * radius
-        )
+        ).convert_alpha()  # Scaling gives a new surface, make sure it's in the window's format too
+        
+        # Course background with the borders already on it
+        self.make_background()
+        
+        # Aim preview dot, drawn once and blitted for every dot along the path
+        self.aim_dot = pygame.Surface((7, 7), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.circle(self.aim_dot, self.ORANGE, (3, 3), 3)
+        
+        # Last aim preview's inputs and dots, reused while nothing changes
+        self.aim_cache_key = None
+        self.aim_cache_dots = []
+        
+        # Aim preview path, filled in by predict_trajectory (kept so it isn't reallocated every frame)
+        self.trajectory_xs = [0.0] * (self.TRAJECTORY_STEPS + 1)
+        self.trajectory_ys = [0.0] * (self.TRAJECTORY_STEPS + 1)
         
         # Game state
         self.current_level = 1
@@ -481,6 +891,19 @@ class MiniGolfGame:
         self.game_paused = False
         self.timer_counter = 0
         
+        # Rendered level label and timer text, redone only when what they show changes
+        self.label_surface = None
+        self.label_level = None
+        self.timer_surface = None
+        self.timer_surface_seconds = None
+        self.timer_rect = pygame.Rect(10, 30, 0, 0)
+        
+        # Screen updates: on still frames only the areas in dirty_rects get sent to the display
+        self.dirty_rects = []
+        self.full_redraw = True        # Whole window has to be flipped this frame
+        self.last_frame_kind = None    # "still", "rolling" or None (see draw)
+        self.last_ball_rect = pygame.Rect(0, 0, 0, 0)  # Where the ball was drawn last frame
+        
         # UI setup
         self.setup_ui()
         
@@ -498,6 +921,17 @@ class MiniGolfGame:
         # Initialize first level
         self.reset_level()
     
+    def make_background(self):
+        # The green course and blue borders never change, so draw them once
+        self.background = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT)).convert()
+        self.background.fill(self.GREEN)
+        
+        # Draw borders (top, bottom, left, right)
+        pygame.draw.rect(self.background, self.BLUE, (0, 0, self.WINDOW_WIDTH, self.BORDER_THICKNESS))
+        pygame.draw.rect(self.background, self.BLUE, (0, self.WINDOW_HEIGHT - self.BORDER_THICKNESS, self.WINDOW_WIDTH, self.BORDER_THICKNESS))
+        pygame.draw.rect(self.background, self.BLUE, (0, 0, self.BORDER_THICKNESS, self.WINDOW_HEIGHT))
+        pygame.draw.rect(self.background, self.BLUE, (self.WINDOW_WIDTH - self.BORDER_THICKNESS, 0, self.BORDER_THICKNESS, self.WINDOW_HEIGHT))
+    
     def setup_ui(self):
         # Controls Y position near bottom
         controls_y = self.WINDOW_HEIGHT - self.BORDER_THICKNESS + (self.BORDER_THICKNESS - 20)//2
@@ -599,6 +1033,7 @@ class MiniGolfGame:
                 self.WINDOW_HEIGHT,
                 self.BORDER_THICKNESS
             )
+            level.bake_background(self.background)
             self.levels.append(level)
         
         # Add moving platforms and repulsors
@@ -703,6 +1138,8 @@ class MiniGolfGame:
         
         # Set current level object
         self.current_level_obj = self.levels[self.current_level - 1]
+        self.ball.set_level(self.current_level)
+        self.hole_xy = (self.current_level_obj.hole_x, self.current_level_obj.hole_y)  # Fixed for the whole level
     
     def reset_game(self):
         # Restart from level 1 and reset timer
@@ -721,172 +1158,167 @@ class MiniGolfGame:
     
     def predict_trajectory(self):
         # Simulate ball path for aiming preview
-        sim_x = self.ball.x
-        sim_y = self.ball.y
         # Initial speed for simulation
         speed = (self.power_slider.value / self.MAX_POWER) * 15
-        vel_x = speed * math.cos(math.radians(self.angle_slider.value))
-        vel_y = -speed * math.sin(math.radians(self.angle_slider.value))
-        points = [(sim_x, sim_y)]
-        
-        for _ in range(200):
-            # Move simulated ball
-            sim_x += vel_x
-            sim_y += vel_y
-            # Apply friction
-            vel_x *= self.AIR_FRICTION_FACTOR
-            vel_y *= self.AIR_FRICTION_FACTOR
-            
-            # Border collisions: bounce with 80% energy
-            if sim_x - self.BALL_RADIUS < self.BORDER_THICKNESS:
-                sim_x = self.BORDER_THICKNESS + self.BALL_RADIUS
-                vel_x *= -0.8
-            if sim_x + self.BALL_RADIUS > self.WINDOW_WIDTH - self.BORDER_THICKNESS:
-                sim_x = self.WINDOW_WIDTH - self.BORDER_THICKNESS - self.BALL_RADIUS
-                vel_x *= -0.8
-            if sim_y - self.BALL_RADIUS < self.BORDER_THICKNESS:
-                sim_y = self.BORDER_THICKNESS + self.BALL_RADIUS
-                vel_y *= -0.8
-            if sim_y + self.BALL_RADIUS > self.WINDOW_HEIGHT - self.BORDER_THICKNESS:
-                sim_y = self.WINDOW_HEIGHT - self.BORDER_THICKNESS - self.BALL_RADIUS
-                vel_y *= -0.8
-            
-            # Obstacle collisions similar to real physics
-            for ox, oy, ow, oh in self.current_level_obj.get_all_obstacles():
-                if (sim_x + self.BALL_RADIUS > ox and
-                    sim_x - self.BALL_RADIUS < ox + ow and
-                    sim_y + self.BALL_RADIUS > oy and
-                    sim_y - self.BALL_RADIUS < oy + oh):
-                    penetration_left = abs(sim_x + self.BALL_RADIUS - ox)
-                    penetration_right = abs(sim_x - self.BALL_RADIUS - (ox + ow))
-                    penetration_top = abs(sim_y + self.BALL_RADIUS - oy)
-                    penetration_bottom = abs(sim_y - self.BALL_RADIUS - (oy + oh))
-                    min_pen = min(penetration_left, penetration_right, penetration_top, penetration_bottom)
-                    if min_pen == penetration_left:
-                        sim_x = ox - self.BALL_RADIUS
-                        vel_x *= -0.8
-                    elif min_pen == penetration_right:
-                        sim_x = ox + ow + self.BALL_RADIUS
-                        vel_x *= -0.8
-                    elif min_pen == penetration_top:
-                        sim_y = oy - self.BALL_RADIUS
-                        vel_y *= -0.8
-                    else:
-                        sim_y = oy + oh + self.BALL_RADIUS
-                        vel_y *= -0.8
-            
-            points.append((sim_x, sim_y))
-            
-            # Stop simulation if speed very low
-            if abs(vel_x) < 0.1 and abs(vel_y) < 0.1:
-                break
-        
-        return points
+        cos_a, sin_a = self.angle_slider.cos_sin
+        vel_x = speed * cos_a
+        vel_y = -speed * sin_a
+        
+        level = self.current_level_obj
+        count = simulate_trajectory(
+            self.ball.x, self.ball.y, vel_x, vel_y,
+            level.get_obstacle_boxes(),  # Obstacles don't move during one preview
+            self.BALL_MIN_X,
+            self.BALL_MAX_X,
+            self.BALL_MIN_Y,
+            self.BALL_MAX_Y,
+            self.BALL_RADIUS,
+            self.AIR_FRICTION_FACTOR,
+            self.TRAJECTORY_STEPS,
+            self.trajectory_xs,
+            self.trajectory_ys,
+            level.query_near if level.use_grid else None
+        )
+        # The lists get reused every call, only the first count points are this path
+        return self.trajectory_xs, self.trajectory_ys, count
     
     def draw_aim_preview(self):
-        points = self.predict_trajectory()
-        total_len = 0
-        # Sum up lengths of each segment
-        for i in range(1, len(points)):
-            x0, y0 = points[i-1]
-            x1, y1 = points[i]
-            total_len += math.hypot(x1 - x0, y1 - y0)  # Distance between points
+        # Same aim, same ball spot and same obstacles means the same dots as last frame
+        level = self.current_level_obj
+        cache_key = (
+            self.angle_slider.value, self.power_slider.value,
+            self.ball.x, self.ball.y,
+            level, level.obstacles_version
+        )
+        if cache_key == self.aim_cache_key:
+            self.screen.blits(self.aim_cache_dots, False)
+            return
+        self.aim_cache_key = cache_key
+        self.full_redraw = True  # Dots moved, so the whole window needs updating
+        self.aim_cache_dots = []
+        
+        xs, ys, count = self.predict_trajectory()
+        # Distance along the path at the end of every segment, in one pass (map/accumulate run the loop in C)
+        cum_lengths = list(itertools.accumulate(map(
+            math.hypot,
+            map(operator.sub, xs[1:count], xs[:count - 1]),
+            map(operator.sub, ys[1:count], ys[:count - 1])
+        )))
+        total_len = cum_lengths[-1] if cum_lengths else 0
         
         if total_len == 0:
             return
         
         spacing = total_len / 15  # Equal spacing along path
-        acc = 0
-        next_d = spacing
-        
-        for i in range(1, len(points)):
-            x0, y0 = points[i-1]
-            x1, y1 = points[i]
-            seg = math.hypot(x1 - x0, y1 - y0)
-            while acc + seg >= next_d:
-                ratio = (next_d - acc) / seg  # Fraction along this segment
-                dx = x0 + ratio * (x1 - x0)  # Interpolated X
-                dy = y0 + ratio * (y1 - y0)  # Interpolated Y
-                pygame.draw.circle(self.screen, self.ORANGE, (int(dx), int(dy)), 3)
-                next_d += spacing
-            acc += seg
-    
-    def draw_level_label(self):
-        self.screen.blit(
-            self.font.render(f"Level {self.current_level}", True, self.WHITE),
-            (10, 5)
-        )
+        dots = self.aim_cache_dots  # (dot image, top-left) pairs, drawn together at the end
+        
+        # Local names for what the loop looks up every dot
+        bisect_left = bisect.bisect_left
+        add_dot = dots.append
+        aim_dot = self.aim_dot
+        
+        for k in range(1, 16):
+            target = min(k * spacing, total_len)  # Last dot sits right at the end of the path
+            # Binary search for the segment the dot lands on instead of walking every segment
+            i = bisect_left(cum_lengths, target)
+            acc = cum_lengths[i - 1] if i else 0  # Distance at the start of that segment
+            ratio = (target - acc) / (cum_lengths[i] - acc)  # Fraction along this segment
+            x0, y0 = xs[i], ys[i]
+            dx = x0 + ratio * (xs[i + 1] - x0)  # Interpolated X
+            dy = y0 + ratio * (ys[i + 1] - y0)  # Interpolated Y
+            add_dot((aim_dot, (int(dx) - 3, int(dy) - 3)))
+        
+        # One blits call for all the dots instead of a draw call per dot
+        self.screen.blits(dots, False)
     
-    def draw_timer(self):
-        # Convert seconds to minutes and seconds
-        minutes = self.timer_seconds // 60  # Whole minutes
-        seconds = self.timer_seconds % 60   # Remainder seconds
-        
-        # Turn red when less than 30 seconds
-        color = self.RED if self.timer_seconds < 30 else self.WHITE
-        
-        timer_text = f"Timer: {minutes} min {seconds} sec"
-        self.screen.blit(
-            self.font.render(timer_text, True, color),
-            (10, 30)
-        )
+    def level_label_blit(self):
+        # (surface, position) of the level label, for the batched blit in draw
+        # Only re-render the text when the level changes
+        if self.current_level != self.label_level:
+            self.label_surface = self.font.render(f"Level {self.current_level}", True, self.WHITE).convert_alpha()
+            self.label_level = self.current_level
+        return (self.label_surface, (10, 5))
+    
+    def timer_blit(self):
+        # (surface, position) of the timer text, for the batched blit in draw
+        # Only re-render the text when the seconds change (once a second, not every frame)
+        if self.timer_seconds != self.timer_surface_seconds:
+            # Convert seconds to minutes and seconds
+            minutes = self.timer_seconds // 60  # Whole minutes
+            seconds = self.timer_seconds % 60   # Remainder seconds
+            
+            # Turn red when less than 30 seconds
+            color = self.RED if self.timer_seconds < 30 else self.WHITE
+            
+            timer_text = f"Timer: {minutes} min {seconds} sec"
+            self.timer_surface = self.font.render(timer_text, True, color).convert_alpha()
+            self.timer_surface_seconds = self.timer_seconds
+            
+            # Old text can be wider than the new one, so update the area covering both
+            old_rect = self.timer_rect
+            self.timer_rect = self.timer_surface.get_rect(topleft=(10, 30))
+            self.dirty_rects.append(self.timer_rect.union(old_rect))
+        return (self.timer_surface, (10, 30))
     
     def draw_win_screen(self):
         # Dark overlay
-        overlay = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.dim_overlay, (0, 0))
         
         # Win message
-        win_text = "YOU WIN! CONGRATS!"
-        text_surface = self.big_font.render(win_text, True, self.YELLOW)
-        text_rect = text_surface.get_rect(center=(self.WINDOW_WIDTH//2, self.WINDOW_HEIGHT//2 - 50))
-        self.screen.blit(text_surface, text_rect)
+        self.screen.blit(self.win_text, self.win_text_rect)
         
         # Play again button
         self.play_again_button.draw(self.screen)
     
     def draw_lose_screen(self):
         # Dark overlay
-        overlay = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.dim_overlay, (0, 0))
         
         # Lose message
-        lose_text = "TIME'S UP! YOU LOSE!"
-        text_surface = self.big_font.render(lose_text, True, self.RED)
-        text_rect = text_surface.get_rect(center=(self.WINDOW_WIDTH//2, self.WINDOW_HEIGHT//2 - 50))
-        self.screen.blit(text_surface, text_rect)
+        self.screen.blit(self.lose_text, self.lose_text_rect)
         
         # Play again button
         self.play_again_button.draw(self.screen)
     
     def draw_pause_screen(self):
         # Dark overlay
-        overlay = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.dim_overlay, (0, 0))
         
         # Pause text
-        self.screen.blit(
-            self.big_font.render("PAUSED", True, self.WHITE),
-            (self.WINDOW_WIDTH//2 - 80, self.WINDOW_HEIGHT//2 - 80)
-        )
+        self.screen.blit(self.pause_text, self.pause_text_pos)
         
         # Resume button
         self.resume_button.draw(self.screen)
     
     def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        # Look these up once instead of for every event (mouse motion makes lots of events)
+        QUIT = pygame.QUIT
+        KEYDOWN = pygame.KEYDOWN
+        MOUSEBUTTONDOWN = pygame.MOUSEBUTTONDOWN
+        MOUSEBUTTONUP = pygame.MOUSEBUTTONUP
+        MOUSEMOTION = pygame.MOUSEMOTION
+        WINDOWEXPOSED = pygame.WINDOWEXPOSED
+        angle_slider = self.angle_slider
+        power_slider = self.power_slider
+        
+        # One call drains the whole queue (already a single batch on the SDL side)
+        events = pygame.event.get()
+        last_index = len(events) - 1
+        for index, event in enumerate(events):
+            event_type = event.type
+            if event_type == QUIT:
                 return False
             
-            elif event.type == pygame.KEYDOWN:
+            elif event_type == KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.game_paused = not self.game_paused
             
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
+            elif event_type == WINDOWEXPOSED:
+                # The window needs repainting (e.g. it was uncovered), so flip it all next frame
+                self.last_frame_kind = None
+            
+            elif event_type == MOUSEBUTTONDOWN:
+                mouse_pos = event.pos  # Already on the event, no need to ask SDL again
                 
                 if self.game_over or self.game_won:
                     if self.play_again_button.is_clicked(mouse_pos):
@@ -895,24 +1327,41 @@ class MiniGolfGame:
                     if self.resume_button.is_clicked(mouse_pos):
                         self.game_paused = False
                 else:
-                    if self.angle_slider.handle_mouse_down(mouse_pos):
+                    if angle_slider.handle_mouse_down(mouse_pos):
                         pass
-                    elif self.power_slider.handle_mouse_down(mouse_pos):
+                    elif power_slider.handle_mouse_down(mouse_pos):
                         pass
                     elif self.launch_button.is_clicked(mouse_pos):
                         if not self.ball.is_moving:
-                            self.ball.launch(self.angle_slider.value, self.power_slider.value, self.MAX_POWER)
+                            self.ball.launch(
+                                angle_slider.value, power_slider.value, self.MAX_POWER,
+                                angle_slider.cos_sin
+                            )
                         else:
                             self.ball.stop()
             
-            elif event.type == pygame.MOUSEBUTTONUP:
-                self.angle_slider.handle_mouse_up()
-                self.power_slider.handle_mouse_up()
+            elif event_type == MOUSEBUTTONUP:
+                angle_slider.handle_mouse_up()
+                power_slider.handle_mouse_up()
             
-            elif event.type == pygame.MOUSEMOTION:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                self.angle_slider.handle_mouse_motion(mouse_x)
-                self.power_slider.handle_mouse_motion(mouse_x)
+            elif event_type == MOUSEMOTION:
+                # Motion only matters while a slider is being dragged,
+                # and not under the pause/win/lose screens (the sliders aren't shown there)
+                angle_dragging = angle_slider.dragging
+                power_dragging = power_slider.dragging
+                if not (angle_dragging or power_dragging):
+                    continue
+                if self.game_paused or self.game_over or self.game_won:
+                    continue
+                # In a run of motion events only the last one matters (the sliders just follow
+                # the latest x), so skip the rest; other events in between still split the runs
+                if index < last_index and events[index + 1].type == MOUSEMOTION:
+                    continue
+                mouse_x = event.pos[0]  # The event already knows where the mouse is
+                if angle_dragging:
+                    angle_slider.handle_mouse_motion(mouse_x)
+                if power_dragging:
+                    power_slider.handle_mouse_motion(mouse_x)
         
         return True
     
@@ -926,48 +1375,87 @@ class MiniGolfGame:
             self.update_timer()     # Update every second
             self.timer_counter = 0
         
-        # Update level objects
-        self.current_level_obj.update(dt)
+        # Local names for the objects used all through here
+        ball = self.ball
+        level = self.current_level_obj
+        
+        # Update level objects (levels where nothing moves have nothing to update)
+        if level.is_animated:
+            level.update(dt)
         
-        # Update ball physics
-        self.ball.update(dt)
+        # Update ball physics (it only moves itself while rolling)
+        if ball.is_moving and not ball.teleporting:
+            ball.update(dt)
         
-        if self.ball.is_moving and not self.ball.teleporting:
+        # The roll above may have stopped the ball, so check again
+        if ball.is_moving and not ball.teleporting:
             # Border collisions
-            self.ball.handle_border_collision(
-                self.BORDER_THICKNESS,
-                self.WINDOW_WIDTH,
-                self.WINDOW_HEIGHT
+            ball.handle_border_collision(
+                self.BALL_MIN_X,
+                self.BALL_MAX_X,
+                self.BALL_MIN_Y,
+                self.BALL_MAX_Y
             )
             
-            # Wall collisions
-            for wall in self.current_level_obj.walls:
-                self.ball.handle_obstacle_collision(wall.get_collision_rect())
+            # The level's rects are already cached, grab them and the ball's methods once
+            first_hit_index = ball.first_hit_index
+            handle_platform_collision = ball.handle_platform_collision
+            
+            # Wall collisions (only resolve the walls the ball might overlap)
+            wall_rects = level.wall_rects
+            wall_hit_rects = level.wall_hit_rects
+            hit = first_hit_index(wall_hit_rects) if wall_hit_rects else -1
+            while hit != -1:
+                ball.handle_obstacle_collision(wall_rects[hit])
+                hit = first_hit_index(wall_hit_rects, hit + 1)
             
             # Platform collisions
-            for platform in self.current_level_obj.moving_platforms:
-                self.ball.handle_platform_collision(platform)
+            platforms = level.moving_platforms
+            if platforms and level.use_grid:
+                # Obstacle indices past the walls are platforms
+                num_walls = len(wall_rects)
+                for i in level.query_near(ball.x, ball.y, ball.radius):
+                    if i >= num_walls:
+                        handle_platform_collision(platforms[i - num_walls])
+            elif platforms:
+                platform_hit_rects = level.platform_hit_rects
+                hit = first_hit_index(platform_hit_rects)
+                while hit != -1:
+                    handle_platform_collision(platforms[hit])
+                    hit = first_hit_index(platform_hit_rects, hit + 1)
             
-            # Repulsor collisions
-            for repulsor in self.current_level_obj.repulsors:
-                self.ball.handle_repulsor_collision(repulsor, self.current_level)
+            # Repulsor collisions (skip any whose box doesn't even touch the ball's box)
+            repulsors = level.repulsors
+            ball_x = ball.x
+            ball_y = ball.y
+            ball_radius = ball.radius
+            for i in level.query_near_repulsors(ball_x, ball_y, ball_radius):
+                repulsor = repulsors[i]
+                reach = ball_radius + repulsor.radius
+                if abs(repulsor.x - ball_x) >= reach or abs(repulsor.y - ball_y) >= reach:
+                    continue
+                if ball.handle_repulsor_collision(repulsor):
+                    # Ball got pushed, check the rest against where it is now
+                    ball_x = ball.x
+                    ball_y = ball.y
             
-            # Check for hole capture
-            dx = self.current_level_obj.hole_x - self.ball.x
-            dy = self.current_level_obj.hole_y - self.ball.y
-            dist_to_hole = math.hypot(dx, dy)  # Distance to hole
+            # Check for hole capture (squared distances, so no sqrt needed)
+            hole_x, hole_y = self.hole_xy
+            dx = hole_x - ball_x
+            dy = hole_y - ball_y
             
-            if dist_to_hole < self.HOLE_RADIUS * self.HOLE_CAPTURE_FACTOR:
-                self.ball.teleporting = True
+            if dx * dx + dy * dy < self.HOLE_CAPTURE_DIST_SQ:
+                ball.teleporting = True
         
         # Handle teleporting sequence
-        if self.ball.teleporting:
-            if self.ball.teleport_to_hole(
-                self.current_level_obj.hole_x,
-                self.current_level_obj.hole_y,
+        if ball.teleporting:
+            hole_x, hole_y = self.hole_xy
+            if ball.teleport_to_hole(
+                hole_x,
+                hole_y,
                 self.hole_sound
             ):
-                self.ball.teleporting = False
+                ball.teleporting = False
                 if self.current_level == self.TOTAL_LEVELS:
                     self.game_won = True
                 else:
@@ -975,36 +1463,48 @@ class MiniGolfGame:
                     self.reset_level()
     
     def draw(self):
-        # Draw the course background
-        self.screen.fill(self.GREEN)
-        
-        # Draw borders (top, bottom, left, right)
-        pygame.draw.rect(self.screen, self.BLUE, (0, 0, self.WINDOW_WIDTH, self.BORDER_THICKNESS))
-        pygame.draw.rect(self.screen, self.BLUE, (0, self.WINDOW_HEIGHT - self.BORDER_THICKNESS, self.WINDOW_WIDTH, self.BORDER_THICKNESS))
-        pygame.draw.rect(self.screen, self.BLUE, (0, 0, self.BORDER_THICKNESS, self.WINDOW_HEIGHT))
-        pygame.draw.rect(self.screen, self.BLUE, (self.WINDOW_WIDTH - self.BORDER_THICKNESS, 0, self.BORDER_THICKNESS, self.WINDOW_HEIGHT))
+        # Local names for what gets checked and drawn on all through here
+        screen = self.screen
+        ball = self.ball
+        level = self.current_level_obj
+        ball_still = not (ball.is_moving or ball.teleporting)
+        overlay_up = self.game_paused or self.game_over or self.game_won
+        
+        # On a course where nothing else moves and no overlay is up, only a few areas change:
+        # "still" frames (aiming) just the timer and maybe the aim preview,
+        # "rolling" frames just the timer and the ball's old and new spots
+        # Anything else, or a switch between kinds, updates the whole window
+        if overlay_up or level.is_animated:
+            frame_kind = None
+        elif not ball_still:
+            frame_kind = "rolling"
+        else:
+            frame_kind = "still"
+        self.full_redraw = frame_kind is None or frame_kind != self.last_frame_kind
+        self.last_frame_kind = frame_kind
         
-        # Draw all level elements
-        self.current_level_obj.draw(self.screen)
+        # Draw the course (background with borders and walls, then platforms, repulsors and hole)
+        level.draw(screen)
         
-        # Draw aim preview if ball is still
-        if not self.ball.is_moving and not self.ball.teleporting:
+        # Draw aim preview if ball is still and the player can actually aim
+        # (no point running the simulation under the pause/win/lose screens)
+        if ball_still and not overlay_up:
             self.draw_aim_preview()
         
-        # Draw ball
-        self.ball.draw(self.screen)
-        
-        # Draw UI
-        self.draw_level_label()
-        self.draw_timer()
-        
-        if not self.ball.is_moving and not self.ball.teleporting:
-            self.angle_slider.draw(self.screen)
-            self.power_slider.draw(self.screen)
-            # Change launch button appearance based on state
-            self.launch_button.text = "GO!" if self.ball.is_moving else "Launch"
-            self.launch_button.color = self.BROWN if self.ball.is_moving else self.BLUE
-            self.launch_button.draw(self.screen)
+        # Draw ball, level label and timer in one batch
+        ball_rect = screen.blits(
+            (ball.blit_item(), self.level_label_blit(), self.timer_blit())
+        )[0]
+        if frame_kind == "rolling":
+            self.dirty_rects.append(ball_rect.union(self.last_ball_rect))
+        self.last_ball_rect = ball_rect
+        
+        # Controls (drawn with shapes, so they stay separate calls)
+        if ball_still:
+            self.angle_slider.draw(screen)
+            self.power_slider.draw(screen)
+            # Only shown while the ball is still, so it always keeps its "Launch" look from setup_ui
+            self.launch_button.draw(screen)
         
         # Overlay screens
         if self.game_paused:
@@ -1016,6 +1516,7 @@ class MiniGolfGame:
     
     def run(self):
         running = True
+        physics_time = 0.0  # Frame time not yet turned into physics steps
         while running:
             # Cap at 60 FPS, dt in seconds
             dt = self.clock.tick(60) / 1000.0  # Convert milliseconds to seconds
@@ -1023,14 +1524,27 @@ class MiniGolfGame:
             # Handle input events
             running = self.handle_events()
             
-            # Update game logic
-            self.update(dt)
+            # Update game logic in fixed steps, so a slow frame runs extra steps
+            # instead of slowing the game down (and every step is the same size)
+            physics_time += dt
+            steps = 0
+            while physics_time >= self.PHYSICS_DT - self.PHYSICS_SLACK and steps < self.MAX_PHYSICS_STEPS:
+                self.update(self.PHYSICS_DT)
+                physics_time -= self.PHYSICS_DT
+                steps += 1
+            if steps == self.MAX_PHYSICS_STEPS:
+                physics_time = 0.0
             
             # Draw everything
             self.draw()
             
-            # Refresh display
-            pygame.display.flip()
+            # Refresh display, only the changed areas when that's all that changed
+            # (and only while they add up to less than the whole window)
+            if self.full_redraw or sum(rect.w * rect.h for rect in self.dirty_rects) > self.WINDOW_AREA:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.dirty_rects)
+            self.dirty_rects.clear()
         
         pygame.quit()
 